@@ -0,0 +1,155 @@
+import os
+import re
+import time
+import threading
+import unicodedata
+from collections import OrderedDict
+import cv2
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Cache settings, overridable from .env
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", 128))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", 60 * 60))
+# How many of the 64 scene hash bits may differ for two frames to count as the same scene
+ANSWER_CACHE_MAX_SCENE_DISTANCE = int(os.getenv("ANSWER_CACHE_MAX_SCENE_DISTANCE", 10))
+
+# Politeness and sentence-final particles. Questions that differ only in these
+# share an answer; any other difference, even one character ("调大" vs "调小"),
+# can change the meaning, so it is a miss.
+FILLER_CHARS = set("请应该吗呢吧啊呀哦嘛")
+
+# Wake phrases the recognizer sometimes keeps at the start of a question
+WAKE_PHRASE = re.compile(r"^(hey|嘿)?\s*remy")
+
+
+def normalize_question(text):
+    """Lowercase, drop the wake phrase and remove all punctuation and spaces,
+    so "Hey REMY ，我该怎么把鸡蛋打进锅里？" and "我该怎么把鸡蛋打进锅里" match."""
+    text = unicodedata.normalize("NFKC", text).lower().strip()
+    text = WAKE_PHRASE.sub("", text)
+    return "".join(
+        ch for ch in text
+        if not unicodedata.category(ch).startswith(("P", "S", "Z", "C"))
+    )
+
+
+def question_key(text):
+    """Normalized question with filler characters removed, so
+    "我该怎么把鸡蛋打进锅里" and "我应该怎么把鸡蛋打进锅里呢" share a key."""
+    return "".join(ch for ch in normalize_question(text) if ch not in FILLER_CHARS)
+
+
+def scene_hash(image_path):
+    """64-bit difference hash of an image, used as a coarse scene state.
+
+    Returns:
+        Optional[int]: the hash, or None if the image cannot be read
+    """
+    image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+    if image is None:
+        return None
+    small = cv2.resize(image, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return sum(1 << i for i, bit in enumerate(bits) if bit)
+
+
+def scene_distance(a, b):
+    """Number of differing bits between two scene hashes."""
+    return bin(a ^ b).count("1")
+
+
+class CachedAnswer:
+    def __init__(self, question, recipe, scene, text, audio):
+        self.question = question
+        self.recipe = recipe
+        self.scene = scene
+        self.text = text
+        self.audio = audio
+        self.created_at = time.monotonic()
+
+
+class AnswerCache:
+    """LRU + TTL cache of spoken answers to recurring voice questions.
+
+    An entry is reused only when the recipe matches, the questions are
+    identical apart from punctuation and filler (see `question_key`) and the
+    scene hashes are within `max_scene_distance` bits. Anything less certain
+    is a miss, so the caller falls back to chat_internal.
+    """
+
+    def __init__(self, max_size=ANSWER_CACHE_SIZE, ttl=ANSWER_CACHE_TTL,
+                 max_scene_distance=ANSWER_CACHE_MAX_SCENE_DISTANCE):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_scene_distance = max_scene_distance
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, question, recipe, scene):
+        """Returns:
+            Optional[CachedAnswer]: the best matching fresh answer, or None
+        """
+        question = question_key(question)
+        if not question or scene is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self._expire()
+            best_key, best_distance = None, self.max_scene_distance + 1
+            for key, entry in self._entries.items():
+                if entry.recipe != recipe or entry.question != question:
+                    continue
+                distance = scene_distance(entry.scene, scene)
+                if distance < best_distance:
+                    best_key, best_distance = key, distance
+
+            if best_key is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best_key)
+            self.hits += 1
+            return self._entries[best_key]
+
+    def put(self, question, recipe, scene, text, audio):
+        """Store an answer (the model response as chat history records it)
+        and its synthesized audio (bytes)."""
+        question = question_key(question)
+        if not question or scene is None or not audio:
+            return
+        key = (recipe, question, scene)
+        with self._lock:
+            self._entries[key] = CachedAnswer(question, recipe, scene, text, audio)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _expire(self):
+        now = time.monotonic()
+        expired = [k for k, e in self._entries.items() if now - e.created_at > self.ttl]
+        for key in expired:
+            del self._entries[key]
+            self.evictions += 1
+
+
+# Shared instance used by the voice loop
+answer_cache = AnswerCache()
@@ -1,5 +1,8 @@
 from aip import AipSpeech
 import os
+import logging
+import threading
+from resilience import ResilientService, ServiceUnavailable
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -8,21 +11,105 @@ APP_ID = os.getenv("BAIDU_APP_ID")
 API_KEY = os.getenv("BAIDU_API_KEY")
 SECRET_KEY = os.getenv("BAIDU_SECRET_KEY")
 
+# Latency limits for one synthesis, in seconds
+TTS_TIMEOUT = float(os.getenv("TTS_TIMEOUT", 3))
+TTS_BUDGET = float(os.getenv("TTS_BUDGET", 6))
+# Override the Baidu endpoints, e.g. to point at a local stub server
+TTS_ENDPOINT = os.getenv("TTS_ENDPOINT")
+TTS_TOKEN_ENDPOINT = os.getenv("TTS_TOKEN_ENDPOINT")
+# Clip played instead of an answer while the service is unavailable
+TTS_FALLBACK_TEXT = os.getenv("TTS_FALLBACK_TEXT", "抱歉，我现在说不出话，请稍后再问我。")
+TTS_FALLBACK_AUDIO = os.getenv(
+    "TTS_FALLBACK_AUDIO", os.path.join(os.path.dirname(os.path.abspath(__file__)), "fallback.mp3")
+)
+
+logger = logging.getLogger(__name__)
+
 # Initialize the Baidu TTS client
 client = AipSpeech(APP_ID, API_KEY, SECRET_KEY)
+client.setConnectionTimeoutInMillis(int(TTS_TIMEOUT * 1000))
+client.setSocketTimeoutInMillis(int(TTS_TIMEOUT * 1000))
+# The SDK keeps its URLs in name-mangled class attributes
+if TTS_ENDPOINT:
+    client._AipSpeech__ttsUrl = TTS_ENDPOINT
+if TTS_TOKEN_ENDPOINT:
+    client._AipBase__accessTokenUrl = TTS_TOKEN_ENDPOINT
 
-def synthesize(text, output_file='audio.mp3'):
-    """Convert text to speech and save it to an audio file."""
+tts_service = ResilientService("tts", timeout=TTS_TIMEOUT, budget=TTS_BUDGET)
+
+_fallback_lock = threading.Lock()
+_fallback_audio = None
+
+class SynthesisError(Exception):
+    """Baidu returned an error instead of audio."""
+
+def _looks_like_mp3(data):
+    return data[:3] == b"ID3" or (len(data) > 1 and data[0] == 0xFF and data[1] & 0xE0 == 0xE0)
+
+def _synthesize_remote(text):
     result = client.synthesis(text, 'zh', 1, {'vol': 5, 'per': 5003})
+    # Check if the result is binary audio data or an error dictionary.
+    # The SDK also hands back non-JSON error pages (e.g. a 502) as bytes.
+    if isinstance(result, dict) or not _looks_like_mp3(result):
+        raise SynthesisError(result if isinstance(result, dict) else result[:200])
+    return result
+
+def fallback_audio():
+    """Returns:
+        Optional[bytes]: the pre-synthesized fallback clip, or None if it has
+        not been created yet (see `prepare_fallback_audio`)
+    """
+    global _fallback_audio
+    with _fallback_lock:
+        if _fallback_audio is None and os.path.exists(TTS_FALLBACK_AUDIO):
+            with open(TTS_FALLBACK_AUDIO, 'rb') as f:
+                _fallback_audio = f.read()
+        return _fallback_audio
+
+def is_fallback_audio(audio):
+    """True if `audio` is the fallback clip rather than a real answer."""
+    return audio is not None and audio == fallback_audio()
+
+def prepare_fallback_audio():
+    """Synthesize the fallback clip to TTS_FALLBACK_AUDIO if it is missing,
+    so it is available later when the service is not."""
+    if os.path.exists(TTS_FALLBACK_AUDIO):
+        return
+    try:
+        audio = tts_service.call(_synthesize_remote, TTS_FALLBACK_TEXT)
+    except ServiceUnavailable as e:
+        logger.warning("Could not prepare fallback audio: %s", e)
+        return
+    with open(TTS_FALLBACK_AUDIO, 'wb') as f:
+        f.write(audio)
+    logger.info("Fallback audio saved to %s", TTS_FALLBACK_AUDIO)
+
+def synthesize(text, output_file='audio.mp3'):
+    """Convert text to speech and save it to an audio file.
+
+    Synthesis runs under a deadline, retries and a circuit breaker. If the
+    service is unavailable, the fallback clip is used instead.
+
+    Returns:
+        Optional[bytes]: the synthesized (or fallback) audio, or None if
+        synthesis failed and there is no fallback clip (output_file is then
+        left untouched)
+    """
+    try:
+        result = tts_service.call(_synthesize_remote, text)
+    except ServiceUnavailable as e:
+        result = fallback_audio()
+        if result is None:
+            logger.error("Error in synthesis: %s", e)
+            return None
+        logger.warning("Error in synthesis, playing fallback audio: %s", e)
 
-    # Check if the result is binary audio data or an error dictionary
-    if not isinstance(result, dict):
-        with open(output_file, 'wb') as f:
-            f.write(result)
-        print(f"Audio saved to {output_file}")
-    else:
-        print(f"Error in synthesis: {result}")
+    with open(output_file, 'wb') as f:
+        f.write(result)
+    logger.info("Audio saved to %s", output_file)
+    return result
 
-# Example usage
+# Example usage: python -m audio.tts
 if __name__ == "__main__":
-    synthesize('简易煎蛋')
\ No newline at end of file
+    prepare_fallback_audio()
+    synthesize('简易煎蛋')
@@ -2,12 +2,104 @@ import cv2
 import base64
 import os
 import time
+import threading
 import tkinter as tk
 from tkinter import Label
 from PIL import Image, ImageTk
+from preview import preview
 
 latest_img_path = ""  # Global variable to store the latest image path
 
+CAMERA_WARMUP_FRAMES = 10  # Frames dropped after opening so the camera can adjust
+CAMERA_READ_TIMEOUT = 5  # Seconds to wait for a frame; older frames count as a failed capture
+
+
+class CameraReader:
+    """Keeps the webcam open and reads frames on a background thread.
+
+    Every frame goes to the live preview, and `capture_and_save_photo` takes
+    the most recent one, so the device is opened (and warmed up) only once.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._frame_ready = threading.Event()
+        self._stop = threading.Event()
+        self._frame = None
+        self._frame_at = 0.0
+        self._thread = None
+
+    def start(self):
+        """Start the reader thread if it is not already running."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="camera", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the reader thread and release the camera."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def latest_frame(self, timeout=CAMERA_READ_TIMEOUT):
+        """Returns the most recent frame, starting the reader if needed.
+
+        Raises if no frame arrives within `timeout`, or if the latest one is
+        older than that (the camera stalled or went away).
+        """
+        self.start()
+        if not self._frame_ready.wait(timeout):
+            raise Exception("Could not open webcam")
+        with self._lock:
+            frame, frame_at = self._frame, self._frame_at
+        if frame is None or time.monotonic() - frame_at > timeout:
+            raise Exception("Failed to capture frame")
+        return frame
+
+    def _clear(self):
+        with self._lock:
+            self._frame = None
+            self._frame_ready.clear()
+
+    def _open(self):
+        video_capture = cv2.VideoCapture(1)
+        if not video_capture.isOpened():
+            video_capture = cv2.VideoCapture(0)
+        if not video_capture.isOpened():
+            return None
+        # Add warm-up time for the camera to adjust
+        for _ in range(CAMERA_WARMUP_FRAMES):
+            video_capture.read()
+        return video_capture
+
+    def _run(self):
+        while not self._stop.is_set():
+            video_capture = self._open()
+            if video_capture is None:
+                self._stop.wait(1)  # Retry until a camera shows up
+                continue
+            try:
+                while not self._stop.is_set():
+                    ret, frame = video_capture.read()
+                    if not ret:
+                        break  # Device went away, reopen it
+                    with self._lock:
+                        self._frame = frame
+                        self._frame_at = time.monotonic()
+                    self._frame_ready.set()
+                    preview.publish(frame)
+            finally:
+                self._clear()  # Don't hand out the last frame of a dead device
+                video_capture.release()
+            self._stop.wait(1)
+
+
+# Shared reader used by every capture
+camera = CameraReader()
+
 def capture_and_save_photo() -> dict[str, str]:
     """Returns:
         dict[str, str]: Dictionary containing:
@@ -15,50 +107,32 @@ def capture_and_save_photo() -> dict[str, str]:
             - 'file_path': Path where the image file was saved (str)
     """
     global latest_img_path  # Update the global variable
-    
-    # Initialize webcam
-    video_capture = cv2.VideoCapture(1)
-    if not video_capture.isOpened():
-        video_capture = cv2.VideoCapture(0)
-    if not video_capture.isOpened():
-        raise Exception("Could not open webcam")
 
-    try:
-        # Add warm-up time for the camera to adjust
-        for _ in range(10):  # Capture several frames to let camera adjust
-            video_capture.read()
-            time.sleep(0.1)  # Small delay between frames
-
-        # Capture single frame
-        ret, frame = video_capture.read()
-        if not ret:
-            raise Exception("Failed to capture frame")
+    # Take the latest frame from the always-open camera
+    frame = camera.latest_frame()
 
-        # Create uploads directory if it doesn't exist
-        upload_dir = "statics/uploads"
-        os.makedirs(upload_dir, exist_ok=True)
+    # Create uploads directory if it doesn't exist
+    upload_dir = "statics/uploads"
+    os.makedirs(upload_dir, exist_ok=True)
 
-        # Generate filename with timestamp
-        timestamp = int(time.time())
-        file_name = f"capture_{timestamp}.jpg"
-        file_path = os.path.join(upload_dir, file_name)
+    # Generate filename with timestamp
+    timestamp = int(time.time())
+    file_name = f"capture_{timestamp}.jpg"
+    file_path = os.path.join(upload_dir, file_name)
 
-        # Save image to file
-        cv2.imwrite(file_path, frame)
+    # Save image to file
+    cv2.imwrite(file_path, frame)
 
-        latest_img_path = file_path  # Update the global variable with the file path
+    latest_img_path = file_path  # Update the global variable with the file path
 
-        # Convert to base64
-        _, buffer = cv2.imencode('.jpg', frame)
-        base64_data = base64.b64encode(buffer).decode('utf-8')
-        
-        return {
-            'base64': f"data:image/jpeg;base64,{base64_data}",
-            'file_path': file_path
-        }
+    # Convert to base64
+    _, buffer = cv2.imencode('.jpg', frame)
+    base64_data = base64.b64encode(buffer).decode('utf-8')
 
-    finally:
-        video_capture.release()
+    return {
+        'base64': f"data:image/jpeg;base64,{base64_data}",
+        'file_path': file_path
+    }
 
 def update_latest_image_label(label):
     """Function to update the Tkinter label with the latest captured image."""
@@ -0,0 +1,156 @@
+import os
+import time
+import json
+import uuid
+import copy
+import queue
+import atexit
+import logging
+import threading
+import contextvars
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Logging settings, overridable from .env
+LOG_FILE = os.getenv("LOG_FILE", "remy.log")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", 5))
+LOG_ROTATE_SECONDS = int(os.getenv("LOG_ROTATE_SECONDS", 24 * 60 * 60))
+LOG_SAMPLE_SECONDS = float(os.getenv("LOG_SAMPLE_SECONDS", 30))
+
+# Correlation id of the chat turn currently being handled
+turn_id = contextvars.ContextVar("turn_id", default="-")
+
+_listener = None
+
+
+def new_turn():
+    """Start a new chat turn and return its correlation id."""
+    tid = uuid.uuid4().hex[:8]
+    turn_id.set(tid)
+    return tid
+
+
+class TurnIdFilter(logging.Filter):
+    """Stamps each record with the current turn id. It runs on the caller's
+    thread, before the record is queued, so the context var is still set."""
+
+    def filter(self, record):
+        record.turn_id = turn_id.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Lets through at most one record per `interval` seconds for each
+    `sample` key passed via `extra`. Records without a key are untouched.
+    The next record let through carries the number it replaced in `suppressed`.
+    """
+
+    def __init__(self, interval=LOG_SAMPLE_SECONDS):
+        super().__init__()
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._last = {}
+        self._suppressed = {}
+
+    def filter(self, record):
+        key = getattr(record, "sample", None)
+        if key is None:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last.get(key, float("-inf")) < self.interval:
+                self._suppressed[key] = self._suppressed.get(key, 0) + 1
+                return False
+            self._last[key] = now
+            record.suppressed = self._suppressed.pop(key, 0)
+        return True
+
+
+class StructuredQueueHandler(QueueHandler):
+    """QueueHandler that keeps the traceback out of the message.
+
+    The stock `prepare` folds the formatted traceback into `msg` and drops
+    `exc_info`; here it is formatted on the caller's thread and kept in
+    `exc_text`, so the writer can emit it as a separate field.
+    """
+
+    def prepare(self, record):
+        exc_text = record.exc_text
+        if record.exc_info and not exc_text:
+            exc_text = logging.Formatter().formatException(record.exc_info)
+        record = copy.copy(record)
+        record.exc_info = None
+        record.exc_text = None
+        record = super().prepare(record)
+        record.exc_text = exc_text
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line."""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "turn_id": getattr(record, "turn_id", "-"),
+            "message": record.getMessage(),
+        }
+        if getattr(record, "sample", None) is not None:
+            entry["sample"] = record.sample
+            entry["suppressed"] = getattr(record, "suppressed", 0)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class SizeAndTimeRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler that also rolls over every `interval` seconds."""
+
+    def __init__(self, filename, max_bytes, backup_count, interval):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        self.interval = interval
+        self.rollover_at = time.time() + interval
+
+    def shouldRollover(self, record):
+        if self.interval > 0 and time.time() >= self.rollover_at:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        self.rollover_at = time.time() + self.interval
+
+
+def setup_logging():
+    """Route all logging through a queue drained by a background thread, so
+    callers never block on file or console I/O. Safe to call more than once."""
+    global _listener
+    if _listener is not None:
+        return
+
+    file_handler = SizeAndTimeRotatingFileHandler(
+        LOG_FILE, LOG_MAX_BYTES, LOG_BACKUP_COUNT, LOG_ROTATE_SECONDS
+    )
+    file_handler.setFormatter(JsonFormatter())
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - [%(turn_id)s] %(message)s'))
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = StructuredQueueHandler(log_queue)
+    queue_handler.addFilter(TurnIdFilter())
+    queue_handler.addFilter(SamplingFilter())
+
+    root = logging.getLogger()
+    root.setLevel(LOG_LEVEL)
+    root.handlers = [queue_handler]
+
+    _listener = QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
@@ -3,6 +3,7 @@ from fastapi.responses import FileResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 import os
 import time
@@ -16,11 +17,15 @@ from zhipuai import ZhipuAI
 import yaml
 import json
 import asyncio
+import logging
+from preview import preview, BOUNDARY
 
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Load prompts
 with open('prompts.yaml', 'r') as file:
     prompts = yaml.safe_load(file)
@@ -108,6 +113,8 @@ async def process_image(image_data: ImageData):
         nparr = np.frombuffer(base64.b64decode(encoded_data), np.uint8)  
         # Converts numpy array to OpenCV image
         img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)  
+        # Feed the live preview from memory
+        preview.publish(img)
 
         # Generate a unique filename
         filename = f"{time.time()}.jpg"
@@ -120,6 +127,14 @@ async def process_image(image_data: ImageData):
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@app.get("/preview")
+async def preview_stream():
+    """Live MJPEG preview of the most recent in-memory frame."""
+    return StreamingResponse(
+        preview.mjpeg(),
+        media_type=f"multipart/x-mixed-replace; boundary={BOUNDARY}"
+    )
+
 @app.post("/chat")
 async def active_chat(
     message: str = Form(...), # user's message from frontend textarea input
@@ -236,7 +251,7 @@ async def chat_internal(user_prompt, system_prompt, image_url, chat_history):
         save_chat_history(chat_history)
         
         # response is a string in json format
-        print(type(response_message))
+        logger.debug("Chat response: %s", response_message)
         return {"response": response_message}
 
     except Exception as e:
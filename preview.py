@@ -0,0 +1,89 @@
+import os
+import time
+import asyncio
+import threading
+import cv2
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Preview settings, overridable from .env
+PREVIEW_FPS = float(os.getenv("PREVIEW_FPS", 5))
+PREVIEW_WIDTH = int(os.getenv("PREVIEW_WIDTH", 320))
+PREVIEW_JPEG_QUALITY = int(os.getenv("PREVIEW_JPEG_QUALITY", 70))
+
+BOUNDARY = "frame"
+
+
+class PreviewStream:
+    """Holds the most recent camera frame in memory and serves a downscaled
+    JPEG of it to any number of viewers.
+
+    Frames are pushed in with `publish` by the camera reader thread (and the
+    /process upload), so the preview never opens the camera or touches the
+    disk. The JPEG is encoded at most `fps` times per second and
+    only when a new frame has arrived; every viewer shares that one encode.
+    """
+
+    def __init__(self, fps=PREVIEW_FPS, width=PREVIEW_WIDTH, quality=PREVIEW_JPEG_QUALITY):
+        if fps <= 0:
+            raise ValueError(f"PREVIEW_FPS must be positive, got {fps}")
+        self.fps = fps
+        self.width = width
+        self.quality = quality
+        self._lock = threading.Lock()
+        self._frame = None
+        self._frame_id = 0
+        self._jpeg = None
+        self._jpeg_id = 0
+        self._encoded_at = 0.0
+
+    def publish(self, frame):
+        """Store a BGR frame (numpy array) as the latest preview source."""
+        if frame is None:
+            return
+        with self._lock:
+            self._frame = frame
+            self._frame_id += 1
+
+    def latest_jpeg(self):
+        """Returns:
+            tuple[int, Optional[bytes]]: id of the frame the JPEG was encoded
+            from and the JPEG bytes (None if nothing has been published yet)
+        """
+        with self._lock:
+            now = time.monotonic()
+            stale = self._frame_id != self._jpeg_id
+            due = now - self._encoded_at >= 1.0 / self.fps
+            if self._frame is not None and stale and due:
+                self._jpeg = self._encode(self._frame)
+                self._jpeg_id = self._frame_id
+                self._encoded_at = now
+            return self._jpeg_id, self._jpeg
+
+    def _encode(self, frame):
+        height, width = frame.shape[:2]
+        if width > self.width:
+            size = (self.width, int(height * self.width / width))
+            frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        return buffer.tobytes()
+
+    async def mjpeg(self):
+        """Async generator of multipart/x-mixed-replace parts for one viewer."""
+        last_id = None
+        while True:
+            jpeg_id, jpeg = self.latest_jpeg()
+            if jpeg is not None and jpeg_id != last_id:
+                last_id = jpeg_id
+                yield (
+                    f"--{BOUNDARY}\r\n"
+                    f"Content-Type: image/jpeg\r\n"
+                    f"Content-Length: {len(jpeg)}\r\n\r\n"
+                ).encode() + jpeg + b"\r\n"
+            await asyncio.sleep(1.0 / self.fps)
+
+
+# Shared instance used by the capture code, the API and the Tk window
+preview = PreviewStream()
@@ -0,0 +1,152 @@
+import os
+import time
+import random
+import logging
+import threading
+from concurrent.futures import Future, wait
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Breaker settings, overridable from .env
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", 3))
+BREAKER_RESET_SECONDS = float(os.getenv("BREAKER_RESET_SECONDS", 30))
+
+
+class ServiceUnavailable(Exception):
+    """Raised when a service call failed within its latency budget, or its
+    circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Fails fast after `failure_threshold` consecutive failed calls.
+
+    A call counts once however many attempts it made, so one bad turn does
+    not open the breaker by itself. Once open, calls are refused for
+    `reset_seconds`; after that a single trial call is let through
+    (half-open) and its outcome closes or reopens the breaker.
+    """
+
+    def __init__(self, name, failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_seconds=BREAKER_RESET_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_seconds:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info("%s circuit closed", self.name)
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    logger.warning("%s circuit opened after %d failed calls", self.name, self._failures)
+                self._opened_at = time.monotonic()
+
+
+class ResilientService:
+    """Runs calls to one remote service with a per-call deadline, jittered
+    retries inside an overall latency budget and a circuit breaker.
+
+    Only exceptions in `retry_on` (plus deadline overruns) count as service
+    failures; anything else is raised to the caller unchanged. Each call
+    runs on its own thread, so calls that overrun their deadline are
+    abandoned (not killed) without holding up later ones; the underlying
+    client should still be given its own socket timeout.
+    """
+
+    def __init__(self, name, timeout, budget, retries=2, backoff=0.2, retry_on=(Exception,), breaker=None):
+        self.name = name
+        self.timeout = timeout
+        self.budget = budget
+        self.retries = retries
+        self.backoff = backoff
+        self.retry_on = retry_on
+        self.breaker = breaker or CircuitBreaker(name)
+
+    def _start(self, fn, args, kwargs):
+        future = Future()
+
+        def run():
+            future.set_running_or_notify_cancel()
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, name=f"{self.name}-call", daemon=True).start()
+        return future
+
+    def call(self, fn, *args, **kwargs):
+        if not self.breaker.allow():
+            raise ServiceUnavailable(f"{self.name} circuit is open")
+
+        deadline = time.monotonic() + self.budget
+        last_error = None
+
+        for attempt in range(self.retries + 1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+
+            future = self._start(fn, args, kwargs)
+            wait([future], timeout=min(self.timeout, remaining))
+            if not future.done():
+                last_error = TimeoutError(f"{self.name} call timed out")
+            elif future.exception() is None:
+                self.breaker.record_success()
+                return future.result()
+            elif isinstance(future.exception(), self.retry_on):
+                last_error = future.exception()
+            else:
+                # Not a service failure (e.g. audio the recognizer could not understand)
+                self.breaker.record_success()
+                raise future.exception()
+
+            logger.warning("%s attempt %d failed: %s", self.name, attempt + 1, last_error)
+            if attempt == self.retries:
+                break
+
+            # Full jitter, capped by what is left of the budget
+            sleep = random.uniform(0, self.backoff * (2 ** attempt))
+            if time.monotonic() + sleep >= deadline:
+                break
+            time.sleep(sleep)
+
+        self.breaker.record_failure()
+        raise ServiceUnavailable(f"{self.name} unavailable: {last_error}")
@@ -11,25 +11,24 @@ import threading
 import signal
 import sys
 import asyncio
-from capture_and_save_photo import capture_and_save_photo
+from capture_and_save_photo import capture_and_save_photo, camera
 import logging
+from log_config import setup_logging, new_turn
 import tkinter as tk
 from PIL import Image, ImageTk
-from audio.tts import synthesize
-from main import active_chat, chat_internal, load_chat_history, save_chat_history
+from audio.tts import synthesize, prepare_fallback_audio, is_fallback_audio
+from resilience import ResilientService, ServiceUnavailable
+from main import app, active_chat, chat_internal, load_chat_history, save_chat_history
+from preview import preview
+from answer_cache import answer_cache, scene_hash
+import uvicorn
+import io
 import pygame
 from pygame import mixer
 import json  # Add this to imports if not already present
 
-# Add logging configuration near the top of the file after imports
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('remy.log'),
-        logging.StreamHandler()
-    ]
-)
+# Queue-based logging: JSON records to a rotating remy.log, written off the hot path
+setup_logging()
 logger = logging.getLogger(__name__)
 
 # Initialize pygame mixer
@@ -38,6 +37,13 @@ pygame.mixer.init()
 # Load environment variables
 dotenv.load_dotenv()
 ACCESS_KEY = os.getenv("PORCUPINE_ACCESS_KEY")
+PREVIEW_PORT = int(os.getenv("PREVIEW_PORT", 8001))
+RECIPE = os.getenv("RECIPE", "egg")  # key into prompts.yaml recipe section
+# Latency limits for one speech recognition, in seconds
+ASR_TIMEOUT = float(os.getenv("ASR_TIMEOUT", 4))
+ASR_BUDGET = float(os.getenv("ASR_BUDGET", 8))
+# Override the Google speech endpoint, e.g. to point at a local stub server
+ASR_ENDPOINT = os.getenv("ASR_ENDPOINT", "http://www.google.com/speech-api/v2/recognize")
 
 # Initialize Tkinter
 root = tk.Tk()
@@ -55,6 +61,13 @@ def init_porcupine():
 
 # Initialize Speech Recognizer
 recognizer = sr.Recognizer()
+recognizer.operation_timeout = ASR_TIMEOUT
+
+# Request errors (e.g. a 502 from the endpoint) and socket timeouts count against the ASR service;
+# audio it could not understand does not
+asr_service = ResilientService(
+    "asr", timeout=ASR_TIMEOUT, budget=ASR_BUDGET, retry_on=(sr.RequestError, TimeoutError, OSError)
+)
 
 # Flag to control the repeating task
 resume_repeating_task = threading.Event()
@@ -67,15 +80,23 @@ def play_audio(file_path='audio.mp3'):
         while mixer.music.get_busy():  # Wait for audio to finish playing
             pygame.time.Clock().tick(10)
     except Exception as e:
-        logger.error(f"Error playing audio: {e}")
+        logger.error("Error playing audio: %s", e)
+
+def play_cached_audio(audio):
+    try:
+        mixer.music.load(io.BytesIO(audio), "mp3")  # Straight from memory, no disk round-trip
+        mixer.music.play()
+        while mixer.music.get_busy():  # Wait for audio to finish playing
+            pygame.time.Clock().tick(10)
+    except Exception as e:
+        logger.error("Error playing audio: %s", e)
 
 # Function for the repeating task
 async def repeating_task():
     while resume_repeating_task.is_set():
-        logger.info("Active chat is running...")
+        new_turn()
+        logger.info("Active chat is running...", extra={"sample": "active_chat_running"})
         res = await active_chat(image_url=capture_and_save_photo()["file_path"])
-        logger.info(f"Active chat response: {res}")
-        logger.info(f"Response string to parse: {res['response']}")  # Debug log
         cleaned_response = res["response"].replace("\n", "").replace("\\n", "").replace("`", "")
         try:
             response_dict = literal_eval(cleaned_response)  # Parse the string into a dictionary
@@ -83,41 +104,38 @@ async def repeating_task():
             # print("TALK NEEDED: ", response_dict.get("talk_needed"))
             # print("TYPE: ", type(response_dict.get("talk_needed")))
             if response_dict.get("talk_needed") == "True" or response_dict.get("talk_needed") == True:  # Check if talk_needed is True
-                synthesize(response_dict["talk_content"])
-                play_audio()
+                logger.info("Active chat talk_content: %s", response_dict["talk_content"])
+                if synthesize(response_dict["talk_content"]) is not None:
+                    play_audio()
+            else:
+                logger.info("talk_needed: False", extra={"sample": "talk_not_needed"})
         except json.JSONDecodeError as e:
-            logger.error(f"JSON parsing error: {e}")
-            logger.error(f"Failed to parse string: {res['response']}")
+            logger.error("JSON parsing error: %s", e)
+            logger.error("Failed to parse string: %s", res['response'])
             # Continue with default behavior if parsing fails
-            synthesize(res["response"])
-            play_audio()
+            if synthesize(res["response"]) is not None:
+                play_audio()
         await asyncio.sleep(2)
 
-# Function to update the Tkinter label with the latest image
+# Function to update the Tkinter label with the latest in-memory preview frame
 def update_image():
-    image_path = capture_and_save_photo()["file_path"]
-    image = Image.open(image_path)
-    image = image.resize((300, 200))  # Resize for display in Tkinter
-    photo = ImageTk.PhotoImage(image)
-    image_label.config(image=photo)
-    image_label.image = photo  # Keep a reference to avoid garbage collection
-    root.after(2000, update_image)  # Schedule to update the image every 2 seconds
+    _, jpeg = preview.latest_jpeg()
+    if jpeg is not None:
+        image = Image.open(io.BytesIO(jpeg))
+        image = image.resize((300, 200))  # Resize for display in Tkinter
+        photo = ImageTk.PhotoImage(image)
+        image_label.config(image=photo)
+        image_label.image = photo  # Keep a reference to avoid garbage collection
+    root.after(int(1000 / preview.fps), update_image)  # Refresh at the preview frame rate
 
 # Start updating images in Tkinter
 update_image()
 
-# Function to update the Tkinter label with the latest image
-def update_image():
-    image_path = capture_and_save_photo()["file_path"]
-    image = Image.open(image_path)
-    image = image.resize((300, 200))  # Resize for display in Tkinter
-    photo = ImageTk.PhotoImage(image)
-    image_label.config(image=photo)
-    image_label.image = photo  # Keep a reference to avoid garbage collection
-    root.after(2000, update_image)  # Schedule to update the image every 2 seconds
+# Serve main.app (and its /preview MJPEG stream) in the background
+def run_preview_server():
+    uvicorn.run(app, host="127.0.0.1", port=PREVIEW_PORT, log_level="warning")
 
-# Start updating images in Tkinter
-update_image()
+preview_thread = threading.Thread(target=run_preview_server, daemon=True)
 
 # Create a function to run the async task
 def run_repeating_task():
@@ -129,26 +147,40 @@ repeating_thread = threading.Thread(target=run_repeating_task, daemon=True)
 # Function to recognize speech after wake word detection
 async def recognize_speech():
     with sr.Microphone() as source:
+        new_turn()
         logger.info("Listening for command...")
         try:
             # Adjust the timeout and phrase_time_limit to be more lenient
             recognizer.adjust_for_ambient_noise(source, duration=0.5)  # Add ambient noise adjustment
             audio = recognizer.listen(source, phrase_time_limit=5, timeout=5)  # Increased from 2,1 to 5,5
-            user_voice_msg = recognizer.recognize_google(audio, language="zh-CN")
-            logger.info(f"Recognized Speech: {user_voice_msg}")
+            user_voice_msg = asr_service.call(recognizer.recognize_google, audio, language="zh-CN", endpoint=ASR_ENDPOINT)
+            logger.info("Recognized Speech: %s", user_voice_msg)
             image_url = capture_and_save_photo()["file_path"]
 
+            # Recurring questions about the same scene are answered from the cache
+            scene = scene_hash(image_url)
+            cached = answer_cache.get(user_voice_msg, RECIPE, scene)
+            if cached is not None:
+                logger.info("Answer cache hit (stats: %s)", answer_cache.stats())
+                # Record the turn as chat_internal would, so later turns keep the context
+                chat_history = load_chat_history()
+                chat_history.append({'role': 'user', 'content': user_voice_msg})
+                chat_history.append({'role': 'assistant', 'content': cached.text})
+                save_chat_history(chat_history)
+                play_cached_audio(cached.audio)
+                return
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Answer cache miss (stats: %s)", answer_cache.stats())
+
             with open('prompts.yaml', 'r') as file:
                 prompts = yaml.safe_load(file)
                 
             res = await chat_internal(
                 user_prompt=user_voice_msg,
-                system_prompt=prompts["passive_system_prompt"]  ,
+                system_prompt=prompts["passive_system_prompt"].format(recipe=prompts['recipe'][RECIPE]),
                 image_url=image_url,
                 chat_history=load_chat_history()
             )
-            logger.info(f"Chat response: {res}")
-            logger.info(f"Response string to parse: {res['response']}")  # Debug log
             cleaned_response = res["response"].replace("\n", "").replace("\\n", "").replace("`", "")
             try:
                 response_dict = literal_eval(cleaned_response)  # Parse the string into a dictionary
@@ -156,22 +188,26 @@ async def recognize_speech():
                 # print("TALK NEEDED: ", response_dict.get("talk_needed"))
                 # print("TYPE: ", type(response_dict.get("talk_needed")))
                 if response_dict.get("talk_needed") == "True" or response_dict.get("talk_needed") == True:  # Check if talk_needed is True
-                    synthesize(response_dict["talk_content"])
-                    play_audio()
+                    answer_audio = synthesize(response_dict["talk_content"])
+                    if answer_audio is not None:
+                        if not is_fallback_audio(answer_audio):
+                            answer_cache.put(user_voice_msg, RECIPE, scene, res["response"], answer_audio)
+                        play_audio()
             except (json.JSONDecodeError, ValueError, SyntaxError) as e:
-                logger.error(f"JSON parsing error: {e}")
-                logger.error(f"Failed to parse string: {res['response']}")
+                logger.error("JSON parsing error: %s", e)
+                logger.error("Failed to parse string: %s", res['response'])
                 # Continue with default behavior if parsing fails
-                synthesize(res["response"])
-                play_audio() 
-            save_chat_history(res)
+                if synthesize(res["response"]) is not None:
+                    play_audio()
             
         except sr.WaitTimeoutError:
             logger.warning("No speech detected within timeout period")
         except sr.UnknownValueError:
             logger.warning("Could not understand the audio")
+        except ServiceUnavailable as e:
+            logger.warning("Speech recognition unavailable, skipping turn: %s", e)
         except Exception as e:
-            logger.error(f"Error during recognition: {e}", exc_info=True)
+            logger.error("Error during recognition: %s", e, exc_info=True)
 
 # Update the function to run the async recognition
 def run_recognition():
@@ -255,6 +291,15 @@ def main():
     # repeating_thread = threading.Thread(target=repeating_task, daemon=True)
     repeating_thread.start()
 
+    # Make sure there is something to say while TTS is down
+    prepare_fallback_audio()
+
+    # Keep the camera open so the preview streams continuously, even while the passive loop is paused
+    camera.start()
+
+    # Start the preview server, stream at http://127.0.0.1:PREVIEW_PORT/preview
+    preview_thread.start()
+
     # Start Tkinter mainloop
     # TODO
     # root.mainloop()
@@ -0,0 +1,65 @@
+import pytest
+
+from answer_cache import AnswerCache, normalize_question, question_key
+
+RESPONSE = '{"talk_needed": True, "talk_content": "中火煎三分钟"}'
+
+
+def test_wake_phrase_and_punctuation_are_ignored():
+    assert normalize_question("Hey REMY ，我该怎么把鸡蛋打进锅里？") == "我该怎么把鸡蛋打进锅里"
+
+
+def test_exact_question_hits():
+    cache = AnswerCache()
+    cache.put("Hey REMY ，我该怎么把鸡蛋打进锅里？", "egg", 0, RESPONSE, b"mp3")
+    assert cache.get("我该怎么把鸡蛋打进锅里", "egg", 0).audio == b"mp3"
+    assert cache.stats()["hits"] == 1
+
+
+def test_filler_differences_hit():
+    assert question_key("我应该怎么把鸡蛋打进锅里呢") == question_key("我该怎么把鸡蛋打进锅里")
+    cache = AnswerCache()
+    cache.put("我该怎么把鸡蛋打进锅里", "egg", 0, RESPONSE, b"mp3")
+    assert cache.get("我应该怎么把鸡蛋打进锅里呢？", "egg", 0) is not None
+
+
+@pytest.mark.parametrize("cached, asked", [
+    ("我应该把火调大一点吗", "我应该把火调小一点吗"),
+    ("开大火还是小火", "开中火还是小火"),
+])
+def test_single_character_change_of_meaning_falls_through(cached, asked):
+    cache = AnswerCache()
+    cache.put(cached, "egg", 0, RESPONSE, b"mp3")
+    assert cache.get(asked, "egg", 0) is None
+
+
+def test_negated_question_falls_through():
+    cache = AnswerCache()
+    cache.put("鸡蛋要煎几分钟", "egg", 0, RESPONSE, b"mp3")
+    assert cache.get("鸡蛋不要煎几分钟", "egg", 0) is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_different_number_falls_through():
+    cache = AnswerCache()
+    cache.put("煎3分钟可以吗", "egg", 0, RESPONSE, b"mp3")
+    assert cache.get("煎5分钟可以吗", "egg", 0) is None
+
+
+def test_other_recipe_or_scene_misses():
+    cache = AnswerCache(max_scene_distance=4)
+    cache.put("鸡蛋要煎几分钟", "egg", 0, RESPONSE, b"mp3")
+    assert cache.get("鸡蛋要煎几分钟", "tomato", 0) is None
+    assert cache.get("鸡蛋要煎几分钟", "egg", 0xFF) is None
+
+
+def test_lru_eviction_and_ttl():
+    cache = AnswerCache(max_size=1)
+    cache.put("鸡蛋要煎几分钟", "egg", 0, RESPONSE, b"mp3")
+    cache.put("要放多少油", "egg", 0, RESPONSE, b"mp3")
+    assert cache.get("鸡蛋要煎几分钟", "egg", 0) is None
+    assert cache.stats()["evictions"] == 1
+
+    cache = AnswerCache(ttl=0)
+    cache.put("要放多少油", "egg", 0, RESPONSE, b"mp3")
+    assert cache.get("要放多少油", "egg", 0) is None
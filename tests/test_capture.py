@@ -0,0 +1,68 @@
+import time
+import threading
+
+import numpy as np
+import pytest
+
+import capture_and_save_photo
+from capture_and_save_photo import CameraReader
+
+
+class FakeVideoCapture:
+    """Stands in for cv2.VideoCapture; `fail` makes read() report a lost
+    device and `stall` makes it hang."""
+
+    fail = threading.Event()
+    stall = threading.Event()
+
+    def __init__(self, index):
+        self.count = 0
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        time.sleep(0.01)
+        while FakeVideoCapture.stall.is_set():
+            time.sleep(0.01)
+        if FakeVideoCapture.fail.is_set():
+            return False, None
+        self.count += 1
+        return True, np.full((48, 64, 3), self.count % 256, np.uint8)
+
+    def release(self):
+        pass
+
+
+@pytest.fixture
+def camera(monkeypatch):
+    FakeVideoCapture.fail.clear()
+    FakeVideoCapture.stall.clear()
+    monkeypatch.setattr(capture_and_save_photo.cv2, "VideoCapture", FakeVideoCapture)
+    monkeypatch.setattr(capture_and_save_photo, "CAMERA_WARMUP_FRAMES", 0)
+    reader = CameraReader()
+    yield reader
+    FakeVideoCapture.stall.clear()
+    reader.stop()
+
+
+def test_latest_frame_keeps_advancing(camera):
+    first = camera.latest_frame(timeout=1)
+    time.sleep(0.1)
+    assert camera.latest_frame(timeout=1)[0, 0, 0] != first[0, 0, 0]
+
+
+def test_lost_device_raises_instead_of_returning_stale_frame(camera):
+    camera.latest_frame(timeout=1)
+    FakeVideoCapture.fail.set()
+    time.sleep(0.1)
+    with pytest.raises(Exception):
+        camera.latest_frame(timeout=0.2)
+
+
+def test_stalled_camera_raises_instead_of_returning_stale_frame(camera):
+    camera.latest_frame(timeout=1)
+    FakeVideoCapture.stall.set()
+    time.sleep(0.3)
+    with pytest.raises(Exception, match="Failed to capture frame"):
+        camera.latest_frame(timeout=0.2)
@@ -0,0 +1,103 @@
+import json
+import time
+import queue
+import logging
+import contextvars
+
+import pytest
+
+from log_config import (
+    JsonFormatter,
+    SamplingFilter,
+    SizeAndTimeRotatingFileHandler,
+    StructuredQueueHandler,
+    TurnIdFilter,
+    new_turn,
+)
+
+
+def record(msg="talk_needed: False", sample=None, exc_info=None):
+    r = logging.LogRecord("remy", logging.INFO, __file__, 1, msg, None, exc_info)
+    if sample is not None:
+        r.sample = sample
+    return r
+
+
+@pytest.fixture
+def queued():
+    """A logger wired like setup_logging(), minus the listener thread."""
+    log_queue = queue.SimpleQueue()
+    handler = StructuredQueueHandler(log_queue)
+    handler.addFilter(TurnIdFilter())
+    logger = logging.getLogger("test_log_config")
+    logger.propagate = False
+    logger.handlers = [handler]
+    logger.setLevel(logging.INFO)
+    yield logger, log_queue
+    logger.handlers = []
+
+
+def test_sampling_lets_one_record_per_key_through_per_interval():
+    sampler = SamplingFilter(interval=0.1)
+    assert sampler.filter(record(sample="talk"))
+    assert not sampler.filter(record(sample="talk"))
+    assert not sampler.filter(record(sample="talk"))
+    # Other keys and unsampled records are independent
+    assert sampler.filter(record(sample="running"))
+    assert sampler.filter(record())
+
+    time.sleep(0.11)
+    next_record = record(sample="talk")
+    assert sampler.filter(next_record)
+    assert next_record.suppressed == 2
+    assert json.loads(JsonFormatter().format(next_record))["suppressed"] == 2
+
+
+def test_traceback_goes_to_exc_info_not_message(queued):
+    logger, log_queue = queued
+    try:
+        1 / 0
+    except ZeroDivisionError as e:
+        logger.error("boom %s", e, exc_info=True)
+
+    entry = json.loads(JsonFormatter().format(log_queue.get_nowait()))
+    assert entry["message"] == "boom division by zero"
+    assert "Traceback" in entry["exc_info"]
+    assert "ZeroDivisionError" in entry["exc_info"]
+
+
+def test_turn_id_is_stamped_on_each_record(queued):
+    logger, log_queue = queued
+
+    def turn():
+        tid = new_turn()
+        logger.info("Listening for command...")
+        logger.info("Recognized Speech: %s", "鸡蛋要煎几分钟")
+        return tid
+
+    tid = contextvars.copy_context().run(turn)
+    entries = [json.loads(JsonFormatter().format(log_queue.get_nowait())) for _ in range(2)]
+    assert [e["turn_id"] for e in entries] == [tid, tid]
+
+    logger.info("outside any turn")
+    assert json.loads(JsonFormatter().format(log_queue.get_nowait()))["turn_id"] == "-"
+
+
+def test_file_rolls_over_when_interval_elapses(tmp_path):
+    path = tmp_path / "remy.log"
+    handler = SizeAndTimeRotatingFileHandler(str(path), max_bytes=0, backup_count=2, interval=0.1)
+    handler.setFormatter(JsonFormatter())
+    try:
+        handler.emit(record("first"))
+        handler.emit(record("still first"))
+        assert not (tmp_path / "remy.log.1").exists()
+
+        time.sleep(0.11)
+        handler.emit(record("second"))
+    finally:
+        handler.close()
+
+    rotated = [json.loads(line)["message"] for line in (tmp_path / "remy.log.1").read_text().splitlines()]
+    current = [json.loads(line)["message"] for line in path.read_text().splitlines()]
+    assert rotated == ["first", "still first"]
+    assert current == ["second"]
@@ -0,0 +1,114 @@
+import time
+import asyncio
+
+import cv2
+import numpy as np
+import pytest
+
+from preview import BOUNDARY, PreviewStream
+
+
+def frame(width=640, height=480, value=0):
+    return np.full((height, width, 3), value, np.uint8)
+
+
+def counting(stream):
+    """Wrap the stream's encoder so tests can see how often it runs."""
+    calls = []
+    encode = stream._encode
+
+    def wrapped(f):
+        calls.append(f)
+        return encode(f)
+
+    stream._encode = wrapped
+    return calls
+
+
+@pytest.mark.parametrize("fps", [0, -1])
+def test_non_positive_fps_is_rejected(fps):
+    with pytest.raises(ValueError):
+        PreviewStream(fps=fps)
+
+
+def test_nothing_published_yet():
+    assert PreviewStream().latest_jpeg() == (0, None)
+
+
+def test_encodes_only_new_frames_at_most_once_per_interval():
+    stream = PreviewStream(fps=10)
+    calls = counting(stream)
+
+    stream.publish(frame(value=1))
+    first_id, first = stream.latest_jpeg()
+
+    # A new frame inside the same 1/fps window is not encoded yet
+    stream.publish(frame(value=2))
+    assert stream.latest_jpeg() == (first_id, first)
+    assert len(calls) == 1
+
+    time.sleep(0.11)
+    second_id, second = stream.latest_jpeg()
+    assert second_id != first_id and second != first
+    assert len(calls) == 2
+
+    # No new frame, no new encode
+    time.sleep(0.11)
+    assert stream.latest_jpeg() == (second_id, second)
+    assert len(calls) == 2
+
+
+def test_viewers_share_one_encode():
+    stream = PreviewStream(fps=5)
+    calls = counting(stream)
+    stream.publish(frame())
+
+    async def first_part(viewer):
+        return await viewer.__anext__()
+
+    async def watch():
+        viewers = [stream.mjpeg() for _ in range(3)]
+        return await asyncio.gather(*(first_part(v) for v in viewers))
+
+    parts = asyncio.run(watch())
+    assert parts[0] == parts[1] == parts[2]
+    assert len(calls) == 1
+
+
+def test_frames_are_downscaled_to_preview_width():
+    stream = PreviewStream(width=320)
+    stream.publish(frame(640, 480))
+    _, jpeg = stream.latest_jpeg()
+    image = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+    assert image.shape[:2] == (240, 320)
+
+
+def test_small_frames_are_not_upscaled():
+    stream = PreviewStream(width=320)
+    stream.publish(frame(160, 120))
+    _, jpeg = stream.latest_jpeg()
+    image = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+    assert image.shape[:2] == (120, 160)
+
+
+def test_mjpeg_parts_are_framed():
+    stream = PreviewStream(fps=20)
+    stream.publish(frame(value=1))
+
+    async def two_parts():
+        viewer = stream.mjpeg()
+        first = await viewer.__anext__()
+        stream.publish(frame(value=200))
+        second = await viewer.__anext__()
+        return first, second
+
+    for part in asyncio.run(two_parts()):
+        head, body = part.split(b"\r\n\r\n", 1)
+        lines = head.split(b"\r\n")
+        assert lines[0] == f"--{BOUNDARY}".encode()
+        assert b"Content-Type: image/jpeg" in lines
+        length = int(lines[-1].split(b": ")[1])
+        assert body.endswith(b"\r\n")
+        jpeg = body[:-2]
+        assert len(jpeg) == length
+        assert jpeg.startswith(b"\xff\xd8") and jpeg.endswith(b"\xff\xd9")
@@ -0,0 +1,207 @@
+import json
+import time
+import importlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import speech_recognition as sr
+
+from resilience import CircuitBreaker, ResilientService, ServiceUnavailable
+
+ASR_RETRY_ON = (sr.RequestError, TimeoutError, OSError)
+ASR_OK = (
+    '{"result":[]}\n'
+    '{"result":[{"alternative":[{"transcript":"鸡蛋要煎几分钟","confidence":0.9}],"final":true}],"result_index":0}\n'
+)
+MP3 = b"ID3" + b"\0" * 64
+
+
+class StubServer:
+    """Local HTTP server that answers each request with the next queued fault
+    ("502", "slow") or, once the queue is empty, a healthy response."""
+
+    def __init__(self):
+        self.faults = []
+        self.requests = 0
+        self.release = threading.Event()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                # Baidu access token
+                self._reply(200, json.dumps({"access_token": "t", "expires_in": 3600}).encode())
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                stub.requests += 1
+                fault = stub.faults.pop(0) if stub.faults else None
+                if fault == "502":
+                    self._reply(502, b"<html>Bad Gateway</html>")
+                    return
+                if fault == "slow":
+                    stub.release.wait(5)
+                if self.path.startswith("/asr"):
+                    self._reply(200, ASR_OK.encode())
+                else:
+                    self._reply(200, MP3)
+
+            def _reply(self, status, body):
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except OSError:
+                    pass  # Client gave up on a slow response
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.release.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = StubServer()
+    yield server
+    server.close()
+
+
+def recognize(stub, operation_timeout=2):
+    recognizer = sr.Recognizer()
+    recognizer.operation_timeout = operation_timeout
+    audio = sr.AudioData(b"\0" * 3200, 16000, 2)
+    return lambda: recognizer.recognize_google(audio, language="zh-CN", endpoint=f"{stub.url}/asr")
+
+
+def asr_service(timeout=1.0, budget=3.0, failure_threshold=3, reset_seconds=30):
+    breaker = CircuitBreaker("asr", failure_threshold=failure_threshold, reset_seconds=reset_seconds)
+    return ResilientService("asr", timeout=timeout, budget=budget, backoff=0.01,
+                            retry_on=ASR_RETRY_ON, breaker=breaker)
+
+
+def test_retries_through_502s(stub):
+    stub.faults = ["502", "502"]
+    assert asr_service().call(recognize(stub)) == "鸡蛋要煎几分钟"
+    assert stub.requests == 3
+
+
+def test_gives_up_within_budget(stub):
+    stub.faults = ["slow"] * 5
+    service = asr_service(timeout=0.3, budget=0.8)
+    started = time.monotonic()
+    with pytest.raises(ServiceUnavailable):
+        service.call(recognize(stub))
+    assert time.monotonic() - started < 1.2
+
+
+def test_socket_timeout_counts_as_failure(stub):
+    # recognize_google lets a read timeout escape as a raw TimeoutError
+    stub.faults = ["slow"]
+    service = asr_service(timeout=2, budget=3)
+    assert service.call(recognize(stub, operation_timeout=0.2)) == "鸡蛋要煎几分钟"
+    assert stub.requests == 2
+
+
+def test_one_failed_call_does_not_open_breaker(stub):
+    stub.faults = ["502"] * 3
+    service = asr_service(budget=5, failure_threshold=3)
+    with pytest.raises(ServiceUnavailable):
+        service.call(recognize(stub))
+    assert stub.requests == 3
+    assert service.breaker.state == "closed"
+
+    # The next turn still reaches the server
+    assert service.call(recognize(stub)) == "鸡蛋要煎几分钟"
+
+
+def test_breaker_opens_after_threshold_failed_calls(stub):
+    stub.faults = ["502"] * 6
+    service = asr_service(budget=5, failure_threshold=2)
+    for _ in range(2):
+        with pytest.raises(ServiceUnavailable, match="unavailable"):
+            service.call(recognize(stub))
+    assert service.breaker.state == "open"
+
+
+def test_breaker_opens_then_recovers_with_hung_calls_in_flight(stub):
+    stub.faults = ["slow"] * 3
+    service = asr_service(timeout=0.2, budget=5, failure_threshold=1, reset_seconds=0.3)
+    with pytest.raises(ServiceUnavailable):
+        service.call(recognize(stub))
+    assert service.breaker.state == "open"
+
+    # Fails fast without reaching the server
+    requests = stub.requests
+    with pytest.raises(ServiceUnavailable, match="circuit is open"):
+        service.call(recognize(stub))
+    assert stub.requests == requests
+
+    # The three slow calls are still hanging; the half-open trial must not wait on them
+    time.sleep(0.35)
+    assert service.breaker.state == "half-open"
+    assert service.call(recognize(stub)) == "鸡蛋要煎几分钟"
+    assert service.breaker.state == "closed"
+
+
+def test_breaker_reopens_when_trial_fails(stub):
+    stub.faults = ["502"] * 6
+    service = asr_service(budget=5, failure_threshold=1, reset_seconds=0.2)
+    with pytest.raises(ServiceUnavailable):
+        service.call(recognize(stub))
+    time.sleep(0.25)
+    with pytest.raises(ServiceUnavailable):
+        service.call(recognize(stub))
+    assert service.breaker.state == "open"
+
+
+def test_unrecognized_audio_is_not_a_service_failure():
+    service = asr_service(failure_threshold=1)
+
+    def not_understood():
+        raise sr.UnknownValueError()
+
+    with pytest.raises(sr.UnknownValueError):
+        service.call(not_understood)
+    assert service.breaker.state == "closed"
+
+
+@pytest.fixture
+def tts(stub, tmp_path, monkeypatch):
+    monkeypatch.setenv("BAIDU_APP_ID", "app")
+    monkeypatch.setenv("BAIDU_API_KEY", "key")
+    monkeypatch.setenv("BAIDU_SECRET_KEY", "secret")
+    monkeypatch.setenv("TTS_ENDPOINT", f"{stub.url}/tts")
+    monkeypatch.setenv("TTS_TOKEN_ENDPOINT", f"{stub.url}/token")
+    monkeypatch.setenv("TTS_TIMEOUT", "0.3")
+    monkeypatch.setenv("TTS_BUDGET", "1")
+    monkeypatch.setenv("TTS_FALLBACK_AUDIO", str(tmp_path / "fallback.mp3"))
+    import audio.tts
+    return importlib.reload(audio.tts)
+
+
+def test_tts_prepares_and_plays_fallback(stub, tts, tmp_path):
+    tts.prepare_fallback_audio()
+    fallback = (tmp_path / "fallback.mp3").read_bytes()
+    assert fallback == MP3
+
+    stub.faults = ["502"] * 3
+    output = tmp_path / "audio.mp3"
+    assert tts.synthesize("中火煎三分钟", output_file=str(output)) == fallback
+    assert tts.is_fallback_audio(output.read_bytes())
+
+
+def test_tts_without_fallback_leaves_output_untouched(stub, tts, tmp_path):
+    stub.faults = ["slow"] * 5
+    output = tmp_path / "audio.mp3"
+    assert tts.synthesize("中火煎三分钟", output_file=str(output)) is None
+    assert not output.exists()